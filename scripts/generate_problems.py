@@ -14,6 +14,11 @@ Usage:
     python scripts/generate_problems.py sat --n 1000 --alpha 4.27 --seed 42
     python scripts/generate_problems.py maxcut --n 1000 --density 0.01 --seed 42
     python scripts/generate_problems.py qubo --n 100 --seed 42
+    python scripts/generate_problems.py ising --n 1000 --output ising.npz
+
+Matrix payloads can be written as JSON (default), compressed NumPy .npz,
+or HDF5 (requires h5py). Binary formats keep the arrays out of Python
+objects entirely; scalar fields are stored alongside as JSON metadata.
 """
 
 import numpy as np
@@ -22,9 +27,65 @@ import sys
 import argparse
 from pathlib import Path
 
+# Optional: faster JSON encoding of numpy arrays
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional: HDF5 output
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+
+# Problem fields holding (potentially large) arrays
+ARRAY_FIELDS = ("J", "h", "adjacency", "Q", "clauses")
+
+FORMAT_EXTENSIONS = {"json": "json", "npz": "npz", "hdf5": "h5"}
+
+# Recorded in every instance's metadata. Bump GENERATOR_VERSION whenever the
+# instances produced for a given seed change. Version 1 was the original
+# PCG64 / per-element sampling release; its instances are not reproduced.
+RNG_NAME = "SFC64"
+GENERATOR_VERSION = 2
+
+
+def make_rng(seed: int) -> np.random.Generator:
+    """
+    Random generator shared by all problem generators.
+
+    Uses the SFC64 bit generator, which is faster than the default PCG64
+    for the large bulk draws made here.
+    """
+    return np.random.Generator(getattr(np.random, RNG_NAME)(seed))
+
+
+def _matrix_stats(M: np.ndarray, block_bytes: int = 1 << 20) -> tuple:
+    """
+    Mean and standard deviation of all entries of M in a single pass over
+    memory: sums and sums of squares are accumulated per cache-sized block
+    of rows.
+    """
+    if M.size == 0:
+        return 0.0, 0.0
+    rows = max(1, block_bytes // max(1, M.shape[1] * M.itemsize))
+    total = 0.0
+    total_sq = 0.0
+    for start in range(0, M.shape[0], rows):
+        block = M[start:start + rows]
+        total += float(block.sum())
+        total_sq += float(np.vdot(block, block))
+    mean = total / M.size
+    return mean, float(np.sqrt(max(total_sq / M.size - mean * mean, 0.0)))
+
 
 def generate_random_ising(n: int, coupling_std: float = 0.5,
-                          field_std: float = 0.1, seed: int = 42) -> dict:
+                          field_std: float = 0.1, seed: int = 42,
+                          compute_stats: bool = True) -> dict:
     """
     Generate random Ising spin glass instance.
 
@@ -36,18 +97,29 @@ def generate_random_ising(n: int, coupling_std: float = 0.5,
         coupling_std: Standard deviation of coupling distribution
         field_std: Standard deviation of field distribution
         seed: Random seed for reproducibility
+        compute_stats: Compute J_mean/J_std from J; otherwise report the
+            values expected from the construction
 
     Returns:
         Dictionary with 'J' (coupling matrix), 'h' (fields), and metadata
     """
-    rng = np.random.default_rng(seed)
+    rng = make_rng(seed)
 
-    J = rng.normal(0, coupling_std, (n, n))
-    J = (J + J.T) / 2  # Symmetrize
-    np.fill_diagonal(J, 0)  # No self-coupling
+    # Built in place to avoid extra n x n temporaries
+    J = rng.standard_normal((n, n))
+    J *= coupling_std
+    J += J.T  # Symmetrize
+    J *= 0.5
+    np.fill_diagonal(J, 0.0)  # No self-coupling
 
     h = rng.normal(0, field_std, n)
 
+    if compute_stats:
+        J_mean, J_std = _matrix_stats(J)
+    else:
+        # Off-diagonal entries ~ N(0, coupling_std^2 / 2), diagonal is zero
+        J_mean, J_std = 0.0, coupling_std * np.sqrt((n - 1) / (2 * n)) if n else 0.0
+
     # Theoretical bounds
     max_possible_energy = -0.5 * np.sum(np.abs(J)) - np.sum(np.abs(h))
 
@@ -57,12 +129,15 @@ def generate_random_ising(n: int, coupling_std: float = 0.5,
         "coupling_std": coupling_std,
         "field_std": field_std,
         "seed": seed,
-        "J": J.tolist(),
-        "h": h.tolist(),
+        "J": J,
+        "h": h,
         "metadata": {
+            "rng": RNG_NAME,
+            "generator_version": GENERATOR_VERSION,
             "num_couplings": int(n * (n - 1) / 2),
-            "J_mean": float(np.mean(J)),
-            "J_std": float(np.std(J)),
+            "J_mean": float(J_mean),
+            "J_std": float(J_std),
+            "stats": "empirical" if compute_stats else "theoretical",
             "h_mean": float(np.mean(h)),
             "h_std": float(np.std(h)),
             "max_possible_energy_bound": float(max_possible_energy)
@@ -70,13 +145,33 @@ def generate_random_ising(n: int, coupling_std: float = 0.5,
     }
 
 
+def _sample_3sat_clauses(rng: np.random.Generator, num_vars: int,
+                         count: int) -> np.ndarray:
+    """Draw `count` random 3-clauses as a (count, 3) int32 literal array."""
+    # Pick 3 distinct variables per clause: draw from shrinking ranges and
+    # shift past the values already taken (uniform over ordered triples)
+    a = rng.integers(0, num_vars, count)
+    b = rng.integers(0, num_vars - 1, count)
+    b += b >= a
+    c = rng.integers(0, num_vars - 2, count)
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    c += c >= lo
+    c += c >= hi
+    vars_chosen = np.stack([a, b, c], axis=1).astype(np.int32)
+
+    # Random signs, literals are 1-indexed
+    signs = rng.choice(np.array([-1, 1], dtype=np.int32), size=(count, 3))
+    return (vars_chosen + 1) * signs
+
+
 def generate_random_3sat(num_vars: int, alpha: float = 4.27,
                          seed: int = 42) -> dict:
     """
     Generate random 3-SAT instance at specified clause-to-variable ratio.
 
     Standard construction: Each clause picks 3 distinct variables uniformly
-    at random, each negated independently with probability 0.5.
+    at random, each negated independently with probability 0.5. Repeated
+    clauses (same literals in any order) are rejected and redrawn.
 
     The phase transition at alpha = 4.27 is where random 3-SAT transitions
     from almost-always satisfiable to almost-never satisfiable. This is the
@@ -91,19 +186,31 @@ def generate_random_3sat(num_vars: int, alpha: float = 4.27,
         seed: Random seed
 
     Returns:
-        Dictionary with 'clauses', 'num_vars', and metadata
+        Dictionary with 'clauses' (num_clauses x 3 int32 array of signed,
+        1-indexed literals), 'num_vars', and metadata
     """
-    rng = np.random.default_rng(seed)
+    rng = make_rng(seed)
     num_clauses = int(num_vars * alpha)
 
-    clauses = []
-    for _ in range(num_clauses):
-        # Pick 3 distinct variables (1-indexed)
-        vars_chosen = rng.choice(num_vars, size=3, replace=False) + 1
-        # Random signs
-        signs = rng.choice([-1, 1], size=3)
-        clause = [int(v * s) for v, s in zip(vars_chosen, signs)]
-        clauses.append(clause)
+    if num_vars < 3:
+        raise ValueError(f"3-SAT needs at least 3 variables, got {num_vars}")
+    max_clauses = 8 * (num_vars * (num_vars - 1) * (num_vars - 2) // 6)
+    if num_clauses > max_clauses:
+        raise ValueError(f"Only {max_clauses} distinct 3-clauses exist over "
+                         f"{num_vars} variables, {num_clauses} requested")
+
+    # Over-sample, drop repeated clauses (keeping first occurrences) and
+    # top up until enough distinct clauses remain
+    clauses = np.empty((0, 3), dtype=np.int32)
+    while len(clauses) < num_clauses:
+        batch_size = int(1.2 * (num_clauses - len(clauses))) + 16
+        clauses = np.concatenate([clauses, _sample_3sat_clauses(rng, num_vars, batch_size)])
+        # Literals ordered by variable, so permuted clauses compare equal
+        order = np.argsort(np.abs(clauses), axis=1)
+        key = np.take_along_axis(clauses, order, axis=1)
+        _, first = np.unique(key, axis=0, return_index=True)
+        clauses = clauses[np.sort(first)]
+    clauses = clauses[:num_clauses]
 
     return {
         "problem_type": "3-sat",
@@ -113,6 +220,8 @@ def generate_random_3sat(num_vars: int, alpha: float = 4.27,
         "seed": seed,
         "clauses": clauses,
         "metadata": {
+            "rng": RNG_NAME,
+            "generator_version": GENERATOR_VERSION,
             "clause_length": 3,
             "phase_transition_alpha": 4.27,
             "regime": "hard" if abs(alpha - 4.27) < 0.1 else
@@ -121,6 +230,19 @@ def generate_random_3sat(num_vars: int, alpha: float = 4.27,
     }
 
 
+def _triu_pairs(idx: np.ndarray, n: int) -> tuple:
+    """
+    Map linear indices over the strict upper triangle of an n x n matrix
+    (row-major order) back to (row, col) pairs.
+    """
+    idx = np.asarray(idx, dtype=np.int64)
+    rows = n - 2 - np.floor(
+        np.sqrt(-8.0 * idx + 4.0 * n * (n - 1) - 7) / 2.0 - 0.5
+    ).astype(np.int64)
+    cols = idx + rows + 1 - n * (n - 1) // 2 + (n - rows) * (n - rows - 1) // 2
+    return rows, cols
+
+
 def generate_random_maxcut(n: int, edge_density: float = 0.01,
                            seed: int = 42) -> dict:
     """
@@ -137,15 +259,20 @@ def generate_random_maxcut(n: int, edge_density: float = 0.01,
     Returns:
         Dictionary with 'adjacency' matrix and metadata
     """
-    rng = np.random.default_rng(seed)
+    rng = make_rng(seed)
 
     # Generate Erdos-Renyi graph
-    adj = np.zeros((n, n), dtype=int)
-    for i in range(n):
-        for j in range(i + 1, n):
-            if rng.random() < edge_density:
-                adj[i, j] = 1
-                adj[j, i] = 1
+    num_pairs = n * (n - 1) // 2
+    if edge_density * num_pairs < n:
+        # Sparse regime: sample the edge count, then the edges themselves
+        num_sampled = rng.binomial(num_pairs, edge_density)
+        idx = rng.choice(num_pairs, size=num_sampled, replace=False)
+        rows, cols = _triu_pairs(idx, n)
+        adj = np.zeros((n, n), dtype=np.int8)
+        adj[rows, cols] = 1
+    else:
+        adj = np.triu(rng.random((n, n)) < edge_density, 1).astype(np.int8)
+    adj |= adj.T
 
     num_edges = int(np.sum(adj) // 2)
 
@@ -155,8 +282,10 @@ def generate_random_maxcut(n: int, edge_density: float = 0.01,
         "num_edges": num_edges,
         "edge_density": edge_density,
         "seed": seed,
-        "adjacency": adj.tolist(),
+        "adjacency": adj,
         "metadata": {
+            "rng": RNG_NAME,
+            "generator_version": GENERATOR_VERSION,
             "expected_edges": int(n * (n - 1) / 2 * edge_density),
             "actual_edges": num_edges,
             "avg_degree": float(2 * num_edges / n) if n > 0 else 0,
@@ -167,46 +296,184 @@ def generate_random_maxcut(n: int, edge_density: float = 0.01,
 
 
 def generate_random_qubo(n: int, density: float = 1.0,
-                         seed: int = 42) -> dict:
+                         seed: int = 42, compute_stats: bool = True) -> dict:
     """
     Generate random QUBO instance.
 
-    Standard construction: Q_ij ~ N(0, 1) for specified density.
+    Standard construction: Q_ij ~ N(0, 1) for specified density, upper
+    triangular (including the diagonal).
 
     Args:
         n: Number of binary variables
         density: Fraction of non-zero entries
         seed: Random seed
+        compute_stats: Compute Q_mean/Q_std from Q; otherwise report the
+            values expected from the construction
 
     Returns:
         Dictionary with 'Q' matrix and metadata
     """
-    rng = np.random.default_rng(seed)
-
-    Q = rng.normal(0, 1, (n, n))
-
-    if density < 1.0:
-        mask = rng.random((n, n)) < density
-        Q *= mask
-
-    # Make upper triangular (standard QUBO form)
-    Q = np.triu(Q)
+    rng = make_rng(seed)
+
+    # Only the upper triangle (standard QUBO form) is sampled
+    num_slots = n * (n + 1) // 2
+    Q = np.zeros((n, n))
+    if density * num_slots < n:
+        # Very sparse: sample the nonzero count, then their positions.
+        # The upper triangle of Q with its diagonal maps onto the strict
+        # upper triangle of an (n+1) x (n+1) matrix via (i, j) -> (i, j+1).
+        num_nonzero = rng.binomial(num_slots, density)
+        idx = rng.choice(num_slots, size=num_nonzero, replace=False)
+        rows, cols = _triu_pairs(idx, n + 1)
+        Q[rows, cols - 1] = rng.standard_normal(num_nonzero)
+    else:
+        vals = rng.standard_normal(num_slots)
+        if density < 1.0:
+            vals *= rng.random(num_slots) < density
+        Q[np.triu(np.ones((n, n), dtype=bool))] = vals
+
+    if compute_stats:
+        Q_mean, Q_std = _matrix_stats(Q)
+    else:
+        # n(n+1)/2 of the n^2 entries are N(0, 1) with probability density
+        Q_mean, Q_std = 0.0, np.sqrt(density * (n + 1) / (2 * n)) if n else 0.0
 
     return {
         "problem_type": "qubo",
         "num_vars": n,
         "density": density,
         "seed": seed,
-        "Q": Q.tolist(),
+        "Q": Q,
         "metadata": {
+            "rng": RNG_NAME,
+            "generator_version": GENERATOR_VERSION,
             "num_nonzero": int(np.count_nonzero(Q)),
-            "Q_mean": float(np.mean(Q)),
-            "Q_std": float(np.std(Q)),
+            "Q_mean": float(Q_mean),
+            "Q_std": float(Q_std),
+            "stats": "empirical" if compute_stats else "theoretical",
             "ising_conversion": "sigma = 2x - 1; J_ij = -Q_ij/4; h_i = -Q_ii/2 - sum_j Q_ij/4"
         }
     }
 
 
+def _json_default(obj):
+    """Fallback JSON encoder for numpy arrays and scalars."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _write_json_stream(problem: dict, f):
+    """
+    Write a problem as JSON, emitting 2-D arrays one row at a time so the
+    full nested list (or encoded string) is never held in memory.
+    """
+    if HAS_ORJSON:
+        def encode(arr):
+            return orjson.dumps(np.ascontiguousarray(arr),
+                                option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    else:
+        def encode(arr):
+            return json.dumps(arr.tolist(), separators=(",", ":"))
+
+    f.write("{")
+    for i, (key, value) in enumerate(problem.items()):
+        if i:
+            f.write(",")
+        f.write(json.dumps(key) + ":")
+        if isinstance(value, np.ndarray) and value.ndim == 2:
+            f.write("[")
+            for r, row in enumerate(value):
+                if r:
+                    f.write(",\n")
+                f.write(encode(row))
+            f.write("]")
+        elif isinstance(value, np.ndarray):
+            f.write(encode(value))
+        else:
+            f.write(json.dumps(value, separators=(",", ":"), default=_json_default))
+    f.write("}\n")
+
+
+def infer_format(path: str) -> str:
+    """Infer the output format from a file extension (defaults to JSON)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".npz":
+        return "npz"
+    if suffix in (".h5", ".hdf5"):
+        return "hdf5"
+    return "json"
+
+
+def detect_format(path: str) -> str:
+    """Detect a problem file's format from its leading magic bytes."""
+    with open(path, "rb") as f:
+        magic = f.read(8)
+    if magic.startswith(b"PK"):
+        return "npz"
+    if magic.startswith(b"\x89HDF"):
+        return "hdf5"
+    return "json"
+
+
+def save_problem(problem: dict, output: str, fmt: str = "json"):
+    """
+    Write a problem instance to disk.
+
+    Args:
+        problem: Problem dictionary as returned by a generator
+        output: Output file path
+        fmt: One of 'json', 'npz', 'hdf5' (written to `output` exactly,
+            whatever its extension)
+    """
+    arrays = {k: np.asarray(v) for k, v in problem.items() if k in ARRAY_FIELDS}
+    meta = {k: v for k, v in problem.items() if k not in ARRAY_FIELDS}
+
+    if fmt == "npz":
+        # Pass a file object so numpy does not append ".npz" to the name
+        with open(output, "wb") as f:
+            np.savez_compressed(f, meta=json.dumps(meta), **arrays)
+    elif fmt == "hdf5":
+        with h5py.File(output, "w") as f:
+            for key, arr in arrays.items():
+                f.create_dataset(key, data=arr, compression="lzf")
+            f.attrs["meta"] = json.dumps(meta)
+    else:
+        with open(output, "w") as f:
+            _write_json_stream(problem, f)
+
+
+def load_problem(path: str) -> dict:
+    """
+    Load a problem instance written by save_problem().
+
+    The format is detected from the file contents, not its extension.
+    Array fields come back as numpy arrays for .npz/HDF5 files and as
+    nested lists for JSON files.
+    """
+    fmt = detect_format(path)
+
+    if fmt == "npz":
+        with np.load(path) as data:
+            problem = json.loads(str(data["meta"]))
+            for key in data.files:
+                if key != "meta":
+                    problem[key] = data[key]
+        return problem
+
+    if fmt == "hdf5":
+        if not HAS_H5PY:
+            raise ImportError("h5py is required to read HDF5 problem files")
+        with h5py.File(path, "r") as f:
+            problem = json.loads(f.attrs["meta"])
+            for key in f.keys():
+                problem[key] = f[key][()]
+        return problem
+
+    with open(path) as f:
+        return json.load(f)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate standard benchmark problem instances"
@@ -219,7 +486,11 @@ def main():
     p_ising.add_argument("--coupling-std", type=float, default=0.5)
     p_ising.add_argument("--field-std", type=float, default=0.1)
     p_ising.add_argument("--seed", type=int, default=42)
+    p_ising.add_argument("--no-stats", action="store_true",
+                         help="Report theoretical J_mean/J_std instead of scanning J")
     p_ising.add_argument("--output", type=str, default=None)
+    p_ising.add_argument("--format", choices=list(FORMAT_EXTENSIONS), default=None,
+                         help="Output format (default: inferred from --output)")
 
     # SAT
     p_sat = subparsers.add_parser("sat", help="Random 3-SAT")
@@ -227,6 +498,8 @@ def main():
     p_sat.add_argument("--alpha", type=float, default=4.27, help="Clause ratio")
     p_sat.add_argument("--seed", type=int, default=42)
     p_sat.add_argument("--output", type=str, default=None)
+    p_sat.add_argument("--format", choices=list(FORMAT_EXTENSIONS), default=None,
+                       help="Output format (default: inferred from --output)")
 
     # Max-Cut
     p_mc = subparsers.add_parser("maxcut", help="Random Max-Cut")
@@ -234,13 +507,19 @@ def main():
     p_mc.add_argument("--density", type=float, default=0.01, help="Edge density")
     p_mc.add_argument("--seed", type=int, default=42)
     p_mc.add_argument("--output", type=str, default=None)
+    p_mc.add_argument("--format", choices=list(FORMAT_EXTENSIONS), default=None,
+                      help="Output format (default: inferred from --output)")
 
     # QUBO
     p_qubo = subparsers.add_parser("qubo", help="Random QUBO")
     p_qubo.add_argument("--n", type=int, default=50, help="Number of variables")
     p_qubo.add_argument("--density", type=float, default=1.0)
     p_qubo.add_argument("--seed", type=int, default=42)
+    p_qubo.add_argument("--no-stats", action="store_true",
+                        help="Report theoretical Q_mean/Q_std instead of scanning Q")
     p_qubo.add_argument("--output", type=str, default=None)
+    p_qubo.add_argument("--format", choices=list(FORMAT_EXTENSIONS), default=None,
+                        help="Output format (default: inferred from --output)")
 
     args = parser.parse_args()
 
@@ -249,23 +528,32 @@ def main():
         sys.exit(1)
 
     generators = {
-        "ising": lambda: generate_random_ising(args.n, args.coupling_std, args.field_std, args.seed),
+        "ising": lambda: generate_random_ising(args.n, args.coupling_std, args.field_std, args.seed,
+                                               not args.no_stats),
         "sat": lambda: generate_random_3sat(args.n, args.alpha, args.seed),
         "maxcut": lambda: generate_random_maxcut(args.n, args.density, args.seed),
-        "qubo": lambda: generate_random_qubo(args.n, args.density, args.seed),
+        "qubo": lambda: generate_random_qubo(args.n, args.density, args.seed,
+                                             not args.no_stats),
     }
 
     problem = generators[args.problem]()
 
     # Remove large arrays from console output
-    display = {k: v for k, v in problem.items()
-               if k not in ("J", "h", "adjacency", "Q", "clauses")}
+    display = {k: v for k, v in problem.items() if k not in ARRAY_FIELDS}
     print(json.dumps(display, indent=2))
 
     # Save to file
-    output = args.output or f"{args.problem}_n{args.n}_seed{args.seed}.json"
-    with open(output, "w") as f:
-        json.dump(problem, f)
+    fmt = args.format or (infer_format(args.output) if args.output else "json")
+    if args.output and infer_format(args.output) != fmt:
+        parser.error(f"--output {args.output} does not match --format {fmt} "
+                     f"(use a .{FORMAT_EXTENSIONS[fmt]} file name)")
+    if fmt == "hdf5" and not HAS_H5PY:
+        print("ERROR: 'h5py' library required for HDF5 output.")
+        print("Install: pip install h5py")
+        sys.exit(1)
+
+    output = args.output or f"{args.problem}_n{args.n}_seed{args.seed}.{FORMAT_EXTENSIONS[fmt]}"
+    save_problem(problem, output, fmt)
     print(f"\nSaved to: {output}")
 
 
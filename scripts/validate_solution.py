@@ -16,15 +16,192 @@ This tool can verify:
 Usage:
     python scripts/validate_solution.py ising --problem problem.json --solution solution.json
     python scripts/validate_solution.py sat --problem problem.json --solution solution.json
+
+Problem files are read with generate_problems.py from the same directory,
+so run the script from scripts/ (as above) or put scripts/ on sys.path.
 """
 
 import numpy as np
+import functools
+import hashlib
 import json
 import sys
 import argparse
+from pathlib import Path
+
+try:
+    from generate_problems import detect_format, load_problem, make_rng
+except ImportError as e:
+    raise ImportError(
+        "validate_solution needs generate_problems.py from the scripts/ "
+        "directory; run it as scripts/validate_solution.py or add scripts/ "
+        "to sys.path") from e
+
+# Optional accelerators are imported lazily, only on the paths that use them:
+# numba for very large SAT instances, scipy for sparse Max-Cut adjacencies.
+
+# Below this many clauses the numpy evaluator beats numba's import and
+# (cached) kernel load time
+SAT_JIT_MIN_CLAUSES = 10_000_000
+
+
+# Cap on per-element errors reported for a single invalid input
+MAX_REPORTED_ERRORS = 10
 
 
-def validate_ising(J, h, spins) -> dict:
+def _invalid_value_errors(values, allowed, message: str) -> list:
+    """
+    Vectorized check that every entry of `values` is in `allowed`.
+
+    Returns error strings built from `message` (formatted with the index
+    `i` and value `value`) for at most MAX_REPORTED_ERRORS offending entries.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "biuf":
+        # Mixed-type input is coerced to strings (or objects), which would
+        # flag valid entries too; compare the original elements instead
+        bad = np.flatnonzero([v not in allowed for v in values])
+    else:
+        bad = np.flatnonzero(~np.isin(arr, allowed))
+    shown = bad[:MAX_REPORTED_ERRORS]
+    errors = [message.format(i=int(i), value=values[int(i)]) for i in shown]
+    if bad.size > MAX_REPORTED_ERRORS:
+        errors.append(f"... and {bad.size - MAX_REPORTED_ERRORS} more invalid values")
+    return errors
+
+
+def _pool_objectives(pool, M, scale: float = 1.0, linear=None,
+                     dtype=np.float32, block_bytes: int = 32 << 20):
+    """
+    Compute scale * x^T M x (+ linear . x) for every row x of a pre-drawn
+    sample pool.
+
+    Rows are evaluated a block at a time with one matrix product each,
+    reusing the same preallocated buffers, so working memory stays bounded
+    for large n while keeping the BLAS-3 batching.
+    """
+    num_samples, n = pool.shape
+    M = np.asarray(M, dtype=dtype)
+    linear = None if linear is None else np.asarray(linear, dtype=dtype)
+
+    rows = int(min(num_samples, max(1, block_bytes // max(1, n * np.dtype(dtype).itemsize))))
+    X = np.empty((rows, n), dtype=dtype)
+    XM = np.empty((rows, n), dtype=dtype)
+    out = np.empty(num_samples, dtype=np.float64)
+
+    for start in range(0, num_samples, rows):
+        k = min(rows, num_samples - start)
+        x, xm = X[:k], XM[:k]
+        np.copyto(x, pool[start:start + k])
+        np.matmul(x, M, out=xm)
+        values = scale * np.einsum("ij,ij->i", x, xm)
+        if linear is not None:
+            values += x @ linear
+        out[start:start + k] = values
+    return out
+
+
+# Identifies how random baselines are computed; part of the cache key
+BASELINE_METHOD = "sfc64-float32"
+
+
+def _baseline_key(*arrays, num_samples: int, seed: int) -> str:
+    """Content hash identifying a random baseline computation."""
+    digest = hashlib.blake2b(f"{BASELINE_METHOD}:{num_samples}:{seed}".encode())
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        digest.update(str(arr.shape).encode())
+        digest.update(arr)
+    return digest.hexdigest()
+
+
+def _cached_baseline(cache_path, key: str, compute) -> dict:
+    """
+    Return the baseline stored at cache_path if its key matches,
+    otherwise compute it and (best effort) write it back.
+    """
+    if cache_path is not None:
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached["baseline"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    baseline = compute()
+
+    if cache_path is not None:
+        try:
+            with open(cache_path, "w") as f:
+                json.dump({"key": key, "baseline": baseline}, f, indent=2)
+        except OSError:
+            pass
+    return baseline
+
+
+def _clause_array(clauses) -> np.ndarray:
+    """Clauses as an (m, k) int32 array; shorter clauses are padded with 0."""
+    try:
+        arr = np.asarray(clauses, dtype=np.int32)
+        if arr.ndim == 2:
+            return arr
+    except ValueError:
+        pass  # Ragged clause lengths
+    width = max((len(c) for c in clauses), default=0)
+    arr = np.zeros((len(clauses), width), dtype=np.int32)
+    for i, clause in enumerate(clauses):
+        arr[i, :len(clause)] = clause
+    return arr
+
+
+def _literal_columns(clause_arr: np.ndarray, num_vars: int) -> np.ndarray:
+    """
+    Column of each literal in the m x 2n clause matrix Q of the matricized
+    SAT encoding: x_v -> v - 1, NOT x_v -> n + v - 1, padding -> 2n.
+    """
+    return np.where(clause_arr > 0, clause_arr - 1,
+                    np.where(clause_arr < 0, num_vars - clause_arr - 1, 2 * num_vars))
+
+
+@functools.lru_cache(maxsize=None)
+def _jit_clause_matvec():
+    """Compile (or load from cache) the numba clause kernel; None without numba."""
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(cache=True, parallel=True, boundscheck=False)
+    def clause_matvec(cols, dual):
+        m, k = cols.shape
+        delta = np.zeros(m, dtype=np.int32)
+        for i in prange(m):
+            acc = 0
+            for j in range(k):
+                acc += dual[cols[i, j]]
+            delta[i] = acc
+        return delta
+
+    return clause_matvec
+
+
+def _clause_matvec(cols, dual):
+    """Q @ u_d with Q given by its per-row literal columns."""
+    if len(cols) >= SAT_JIT_MIN_CLAUSES:
+        kernel = _jit_clause_matvec()
+        if kernel is not None:
+            return kernel(cols, dual)
+    return dual[cols].sum(axis=1, dtype=np.int32)
+
+
+def _is_sparse(obj) -> bool:
+    """True for scipy.sparse matrices (without importing scipy ourselves)."""
+    sparse = sys.modules.get("scipy.sparse")
+    return sparse is not None and sparse.issparse(obj)
+
+
+def validate_ising(J, h, spins, cache_path=None) -> dict:
     """
     Validate an Ising solution.
 
@@ -34,21 +211,21 @@ def validate_ising(J, h, spins) -> dict:
         J: Coupling matrix (n x n)
         h: Local field vector (n)
         spins: Spin configuration (list of +1/-1)
+        cache_path: Optional JSON file caching the random baseline
 
     Returns:
         Validation result dictionary
     """
-    J = np.array(J, dtype=np.float64)
-    h = np.array(h, dtype=np.float64)
+    J = np.asarray(J, dtype=np.float64)
+    h = np.asarray(h, dtype=np.float64)
     sigma = np.array(spins, dtype=np.float64)
     n = len(spins)
 
     errors = []
 
     # Check spin values
-    for i, s in enumerate(spins):
-        if s not in [-1, 1]:
-            errors.append(f"Spin {i} has invalid value {s} (must be +1 or -1)")
+    errors += _invalid_value_errors(spins, [-1, 1],
+                                    "Spin {i} has invalid value {value} (must be +1 or -1)")
 
     if len(spins) != J.shape[0]:
         errors.append(f"Spin count {len(spins)} != problem size {J.shape[0]}")
@@ -61,16 +238,24 @@ def validate_ising(J, h, spins) -> dict:
 
     # Random baseline (average over many random configurations)
     num_samples = 1000
-    rng = np.random.default_rng(0)
-    random_energies = []
-    for _ in range(num_samples):
-        rand_spins = rng.choice([-1, 1], size=n).astype(np.float64)
-        rand_energy = -0.5 * rand_spins @ J @ rand_spins - np.dot(h, rand_spins)
-        random_energies.append(rand_energy)
 
-    mean_random = np.mean(random_energies)
-    std_random = np.std(random_energies)
-    best_random = np.min(random_energies)
+    def compute_baseline():
+        # Single precision is ample for baseline statistics and halves
+        # the memory traffic of the matrix product
+        rng = make_rng(0)
+        pool = 2 * rng.integers(0, 2, size=(num_samples, n), dtype=np.int8) - 1
+        random_energies = _pool_objectives(pool, J, scale=-0.5, linear=-h)
+        return {
+            "mean_energy": float(np.mean(random_energies)),
+            "std_energy": float(np.std(random_energies)),
+            "best_of_1000": float(np.min(random_energies))
+        }
+
+    key = _baseline_key(J, h, num_samples=num_samples, seed=0)
+    baseline = _cached_baseline(cache_path, key, compute_baseline)
+    mean_random = baseline["mean_energy"]
+    std_random = baseline["std_energy"]
+    best_random = baseline["best_of_1000"]
 
     improvement_over_mean = (mean_random - energy) / abs(mean_random) * 100 if mean_random != 0 else 0
     improvement_over_best = (best_random - energy) / abs(best_random) * 100 if best_random != 0 else 0
@@ -78,11 +263,7 @@ def validate_ising(J, h, spins) -> dict:
     return {
         "valid": True,
         "energy": float(energy),
-        "random_baseline": {
-            "mean_energy": float(mean_random),
-            "std_energy": float(std_random),
-            "best_of_1000": float(best_random)
-        },
+        "random_baseline": baseline,
         "improvement_over_random_mean": f"{improvement_over_mean:.1f}%",
         "improvement_over_random_best": f"{improvement_over_best:.1f}%",
         "sigma_below_mean": float((mean_random - energy) / std_random) if std_random > 0 else 0
@@ -93,10 +274,14 @@ def validate_sat(clauses, num_vars, assignment) -> dict:
     """
     Validate a SAT solution.
 
-    Checks each clause against the assignment.
+    Uses the matricized encoding: with Q the m x 2n clause/literal
+    incidence matrix and u_d = [x, 1 - x] the dualized assignment, clause
+    i is satisfied iff (Q @ u_d)_i > 0. Q is kept as per-row literal
+    columns, so the product is O(m * k) (numba-compiled for very large m
+    when available).
 
     Args:
-        clauses: List of clauses in CNF format
+        clauses: List of clauses in CNF format, or an (m, k) int array
         num_vars: Number of variables
         assignment: List of 0/1 values (0=False, 1=True)
 
@@ -108,33 +293,23 @@ def validate_sat(clauses, num_vars, assignment) -> dict:
     if len(assignment) != num_vars:
         errors.append(f"Assignment length {len(assignment)} != num_vars {num_vars}")
 
-    for i, a in enumerate(assignment):
-        if a not in [0, 1]:
-            errors.append(f"Assignment[{i}] has invalid value {a} (must be 0 or 1)")
+    errors += _invalid_value_errors(assignment, [0, 1],
+                                    "Assignment[{i}] has invalid value {value} (must be 0 or 1)")
+
+    clause_arr = _clause_array(clauses)
+    if clause_arr.size and np.abs(clause_arr).max() > len(assignment):
+        errors.append(f"Clause literal out of range for {len(assignment)} variables")
 
     if errors:
         return {"valid": False, "errors": errors}
 
-    satisfied = 0
-    unsatisfied_clauses = []
-
-    for idx, clause in enumerate(clauses):
-        clause_sat = False
-        for lit in clause:
-            var = abs(lit) - 1
-            if lit > 0 and assignment[var] == 1:
-                clause_sat = True
-                break
-            elif lit < 0 and assignment[var] == 0:
-                clause_sat = True
-                break
-        if clause_sat:
-            satisfied += 1
-        else:
-            if len(unsatisfied_clauses) < 10:
-                unsatisfied_clauses.append(idx)
-
-    fraction = satisfied / len(clauses) if clauses else 1.0
+    x = np.asarray(assignment, dtype=np.uint8)
+    dual = np.concatenate([x, 1 - x, np.zeros(1, dtype=np.uint8)])
+    delta = _clause_matvec(_literal_columns(clause_arr, num_vars), dual)
+    satisfied = int(np.count_nonzero(delta))
+    unsatisfied_clauses = np.flatnonzero(delta == 0)[:10].tolist()
+
+    fraction = satisfied / len(clauses) if len(clauses) else 1.0
     alpha = len(clauses) / num_vars if num_vars > 0 else 0
 
     return {
@@ -154,41 +329,50 @@ def validate_maxcut(adjacency, partition) -> dict:
     """
     Validate a Max-Cut solution.
 
-    Counts edges between the two partition sets.
+    Counts edges between the two partition sets. Sparse (scipy.sparse)
+    adjacency matrices are handled without densifying, in O(|E|).
 
     Args:
-        adjacency: Graph adjacency matrix
+        adjacency: Graph adjacency matrix (dense or scipy.sparse)
         partition: List of +1/-1 values (partition assignment)
 
     Returns:
         Validation result dictionary
     """
-    adj = np.array(adjacency)
+    sparse = _is_sparse(adjacency)
+    adj = adjacency if sparse else np.asarray(adjacency)
     n = adj.shape[0]
 
     errors = []
     if len(partition) != n:
         errors.append(f"Partition length {len(partition)} != graph size {n}")
 
-    for i, p in enumerate(partition):
-        if p not in [-1, 1]:
-            errors.append(f"Partition[{i}] has invalid value {p} (must be +1 or -1)")
+    errors += _invalid_value_errors(partition, [-1, 1],
+                                    "Partition[{i}] has invalid value {value} (must be +1 or -1)")
 
     if errors:
         return {"valid": False, "errors": errors}
 
-    cut_value = 0
-    total_edges = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            if adj[i, j] != 0:
-                total_edges += 1
-                if partition[i] != partition[j]:
-                    cut_value += int(adj[i, j])
+    # Edge weights are truncated to integers (as int(w_ij) per edge), so
+    # dense and sparse inputs give identical, exact integer cut values
+    s = np.asarray(partition, dtype=np.int64)
+    if sparse:
+        # Only stored upper-triangle edges are visited
+        import scipy.sparse
+        upper = scipy.sparse.triu(scipy.sparse.csr_matrix(adj), k=1, format="coo")
+        total_edges = int(np.count_nonzero(upper.data))
+        weights = upper.data.astype(np.int64)
+        cut_value = int((weights * (s[upper.row] != s[upper.col])).sum())
+    else:
+        # Each upper-triangle edge contributes w_ij * (1 - s_i * s_j) / 2
+        upper = np.triu(adj, 1)
+        total_edges = int(np.count_nonzero(upper))
+        weights = upper.astype(np.int64)
+        cut_value = int((weights.sum() - s @ (weights @ s)) // 2)
 
     cut_ratio = cut_value / total_edges if total_edges > 0 else 0
 
-    set_a = sum(1 for p in partition if p == 1)
+    set_a = int(np.count_nonzero(s == 1))
     set_b = n - set_a
 
     return {
@@ -202,7 +386,7 @@ def validate_maxcut(adjacency, partition) -> dict:
     }
 
 
-def validate_qubo(Q, solution) -> dict:
+def validate_qubo(Q, solution, cache_path=None) -> dict:
     """
     Validate a QUBO solution.
 
@@ -211,11 +395,12 @@ def validate_qubo(Q, solution) -> dict:
     Args:
         Q: QUBO matrix
         solution: Binary solution vector (list of 0/1)
+        cache_path: Optional JSON file caching the random baseline
 
     Returns:
         Validation result dictionary
     """
-    Q = np.array(Q, dtype=np.float64)
+    Q = np.asarray(Q, dtype=np.float64)
     x = np.array(solution, dtype=np.float64)
     n = len(solution)
 
@@ -223,9 +408,8 @@ def validate_qubo(Q, solution) -> dict:
     if len(solution) != Q.shape[0]:
         errors.append(f"Solution length {len(solution)} != Q size {Q.shape[0]}")
 
-    for i, v in enumerate(solution):
-        if v not in [0, 1]:
-            errors.append(f"Solution[{i}] has invalid value {v} (must be 0 or 1)")
+    errors += _invalid_value_errors(solution, [0, 1],
+                                    "Solution[{i}] has invalid value {value} (must be 0 or 1)")
 
     if errors:
         return {"valid": False, "errors": errors}
@@ -233,44 +417,83 @@ def validate_qubo(Q, solution) -> dict:
     objective = float(x @ Q @ x)
 
     # Random baseline
-    rng = np.random.default_rng(0)
-    random_objectives = []
-    for _ in range(1000):
-        rand_x = rng.choice([0, 1], size=n).astype(np.float64)
-        random_objectives.append(float(rand_x @ Q @ rand_x))
+    def compute_baseline():
+        rng = make_rng(0)
+        pool = rng.integers(0, 2, size=(1000, n), dtype=np.int8)
+        random_objectives = _pool_objectives(pool, Q)
+        return {
+            "mean_objective": float(np.mean(random_objectives)),
+            "best_of_1000": float(np.min(random_objectives))
+        }
+
+    key = _baseline_key(Q, num_samples=1000, seed=0)
 
     return {
         "valid": True,
         "objective": objective,
-        "num_ones": int(sum(solution)),
-        "random_baseline": {
-            "mean_objective": float(np.mean(random_objectives)),
-            "best_of_1000": float(np.min(random_objectives))
-        }
+        "num_ones": int(np.count_nonzero(x)),
+        "random_baseline": _cached_baseline(cache_path, key, compute_baseline)
     }
 
 
+# dtypes used when converting JSON array fields to numpy (None = inferred)
+ARRAY_DTYPES = {"J": np.float64, "h": np.float64, "Q": np.float64,
+                "adjacency": None, "clauses": np.int32}
+
+
+def load_problem_file(path: str) -> dict:
+    """
+    Load a problem file with its array fields as numpy arrays.
+
+    Besides the generator formats, accepts a bare sparse adjacency matrix
+    saved with scipy.sparse.save_npz (Max-Cut). JSON arrays are converted
+    once, with the fixed dtypes in ARRAY_DTYPES.
+    """
+    path = str(path)
+    if detect_format(path) == "npz":
+        with np.load(path) as data:
+            is_sparse = "format" in data.files and "meta" not in data.files
+        if is_sparse:
+            try:
+                import scipy.sparse
+            except ImportError:
+                raise ImportError("scipy is required to read sparse adjacency .npz files")
+            return {"adjacency": scipy.sparse.load_npz(path)}
+
+    problem = load_problem(path)
+    for key, dtype in ARRAY_DTYPES.items():
+        if isinstance(problem.get(key), list):
+            try:
+                problem[key] = np.asarray(problem[key], dtype=dtype)
+            except ValueError:
+                pass  # Ragged (e.g. mixed-length clauses): keep as lists
+    return problem
+
+
 def main():
     parser = argparse.ArgumentParser(description="Validate optimization solutions")
     parser.add_argument("problem_type", choices=["ising", "sat", "maxcut", "qubo"])
-    parser.add_argument("--problem", required=True, help="Problem JSON file")
+    parser.add_argument("--problem", required=True, help="Problem file (.json, .npz or .h5)")
     parser.add_argument("--solution", required=True, help="Solution JSON file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read/write the <problem>.baseline.json random-baseline cache")
 
     args = parser.parse_args()
 
-    with open(args.problem) as f:
-        problem = json.load(f)
+    cache_path = None if args.no_cache else Path(args.problem).with_suffix(".baseline.json")
+
+    problem = load_problem_file(args.problem)
     with open(args.solution) as f:
         solution = json.load(f)
 
     if args.problem_type == "ising":
-        result = validate_ising(problem["J"], problem["h"], solution["spins"])
+        result = validate_ising(problem["J"], problem["h"], solution["spins"], cache_path)
     elif args.problem_type == "sat":
         result = validate_sat(problem["clauses"], problem["num_vars"], solution["assignment"])
     elif args.problem_type == "maxcut":
         result = validate_maxcut(problem["adjacency"], solution["partition"])
     elif args.problem_type == "qubo":
-        result = validate_qubo(problem["Q"], solution["solution"])
+        result = validate_qubo(problem["Q"], solution["solution"], cache_path)
 
     print(json.dumps(result, indent=2))
 
@@ -11,6 +11,10 @@ Verifies Daugherty Engine performance claims by:
 This script does NOT require access to the engine source code.
 It uses only the public REST API endpoints.
 
+Local instance generation imports generate_problems.py from this
+directory, so run the script as scripts/verify_claims.py (or put
+scripts/ on sys.path when importing it).
+
 Usage:
     python scripts/verify_claims.py --api-url http://localhost:5000
     python scripts/verify_claims.py --claim SAT-001
@@ -18,17 +22,29 @@ Usage:
 """
 
 import json
+import os
 import sys
+import tempfile
+import threading
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Try to import requests for API calls
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
 
+# Optional: faster JSON encoding of numpy payloads
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Try to import numpy for local problem generation
 try:
     import numpy as np
@@ -36,6 +52,46 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
+# Local problem generation reuses generate_problems.py, which must be
+# importable (it is when this script is run from, or with, scripts/)
+try:
+    from generate_problems import generate_random_ising, make_rng
+    HAS_GENERATORS = True
+except ImportError:
+    HAS_GENERATORS = False
+
+# Serialized request payloads are cached here, keyed by problem parameters.
+# Bump PAYLOAD_CACHE_VERSION whenever problem generation changes.
+PAYLOAD_CACHE_DIR = Path(__file__).parent.parent / ".payload_cache"
+PAYLOAD_CACHE_VERSION = 3
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Keep-alive sessions, one per thread (requests.Session is not documented
+# as thread-safe), so repeated requests from a worker reuse connections
+_thread_local = threading.local()
+
+
+_print_lock = threading.Lock()
+
+
+def log_progress(claim: dict, message: str):
+    """Print a progress line tagged with the claim id (safe across threads)."""
+    with _print_lock:
+        print(f"[{claim['id']}] {message}", flush=True)
+
+
+def get_session():
+    """Return this thread's pooled requests.Session, creating it on first use."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _thread_local.session = session
+    return session
+
 
 def load_claims():
     """Load benchmark claims from data file."""
@@ -44,6 +100,86 @@ def load_claims():
         return json.load(f)
 
 
+def _encode_json(obj) -> bytes:
+    """Encode a payload dict (values may be numpy arrays) as JSON bytes."""
+    if HAS_ORJSON:
+        # orjson only serializes C-contiguous arrays
+        obj = {k: np.ascontiguousarray(v) if isinstance(v, np.ndarray) else v
+               for k, v in obj.items()}
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=lambda a: a.tolist()).encode()
+
+
+def _cached_payload(name: str, build) -> bytes:
+    """
+    Return the JSON-encoded request payload cached on disk under `name`,
+    building and storing it first if needed.
+    """
+    path = PAYLOAD_CACHE_DIR / f"{name}_v{PAYLOAD_CACHE_VERSION}.json"
+    try:
+        return path.read_bytes()
+    except OSError:
+        pass
+
+    data = _encode_json(build())
+
+    # Write to a temp file and rename it into place, so an interrupted
+    # write never leaves a truncated payload for later runs (or threads)
+    tmp_name = None
+    try:
+        PAYLOAD_CACHE_DIR.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=PAYLOAD_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+        tmp_name = None
+    except OSError:
+        pass
+    finally:
+        if tmp_name is not None:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+    return data
+
+
+def ising_payload(n: int, seed: int = 42) -> bytes:
+    """Serialized /solve/ising payload for a random instance."""
+    def build():
+        problem = generate_random_ising(n, coupling_std=0.5, field_std=0.1,
+                                        seed=seed, compute_stats=False)
+        return {"J": problem["J"], "h": problem["h"]}
+
+    return _cached_payload(f"ising_n{n}_seed{seed}", build)
+
+
+def maxcut_payload(n: int, seed: int = 42) -> bytes:
+    """Serialized /solve/maxcut payload for a random graph with 5n distinct edges."""
+    def build():
+        rng = make_rng(seed)
+        num_edges = min(5 * n, n * (n - 1) // 2)
+
+        # Draw candidate pairs in bulk, drop self-loops and repeats
+        # (keeping first occurrences) and top up until enough remain
+        edges = np.empty((0, 2), dtype=np.int64)
+        while len(edges) < num_edges:
+            pairs = rng.integers(0, n, size=(6 * n, 2))
+            pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+            pairs.sort(axis=1)
+            edges = np.concatenate([edges, pairs])
+            _, first = np.unique(edges, axis=0, return_index=True)
+            edges = edges[np.sort(first)]
+        edges = edges[:num_edges]
+
+        adj = np.zeros((n, n), dtype=np.int8)
+        adj[edges[:, 0], edges[:, 1]] = 1
+        adj[edges[:, 1], edges[:, 0]] = 1
+        return {"adjacency": adj}
+
+    return _cached_payload(f"maxcut_n{n}_seed{seed}", build)
+
+
 def verify_sat_claim(api_url: str, claim: dict) -> dict:
     """Verify SAT performance claim via API."""
     params = claim["parameters"]
@@ -54,10 +190,10 @@ def verify_sat_claim(api_url: str, claim: dict) -> dict:
         "num_trials": 5
     }
 
-    print(f"  Sending verification request: n={params['num_vars']}, alpha={params['alpha']}")
+    log_progress(claim, f"Sending verification request: n={params['num_vars']}, alpha={params['alpha']}")
 
     try:
-        resp = requests.post(f"{api_url}/verify/sat", json=payload, timeout=300)
+        resp = get_session().post(f"{api_url}/verify/sat", json=payload, timeout=300)
         result = resp.json()
 
         if result.get("success"):
@@ -86,26 +222,21 @@ def verify_ising_claim(api_url: str, claim: dict) -> dict:
     params = claim["parameters"]
     n = params["num_spins"]
 
-    print(f"  Generating random Ising instance: n={n}")
+    log_progress(claim, f"Generating random Ising instance: n={n}")
 
     if not HAS_NUMPY:
         return {"claim_id": claim["id"], "verified": None, "error": "numpy required"}
+    if not HAS_GENERATORS:
+        return {"claim_id": claim["id"], "verified": None,
+                "error": "generate_problems.py not importable (add scripts/ to sys.path)"}
 
-    np.random.seed(42)
-    J = np.random.randn(n, n) * 0.5
-    J = (J + J.T) / 2
-    np.fill_diagonal(J, 0)
-    h = np.random.randn(n) * 0.1
-
-    payload = {
-        "J": J.tolist(),
-        "h": h.tolist()
-    }
+    payload = ising_payload(n)
 
-    print(f"  Sending to API (this may take a moment for n={n})...")
+    log_progress(claim, f"Sending to API (this may take a moment for n={n})...")
 
     try:
-        resp = requests.post(f"{api_url}/solve/ising", json=payload, timeout=600)
+        resp = get_session().post(f"{api_url}/solve/ising", data=payload,
+                                  headers=JSON_HEADERS, timeout=600)
         result = resp.json()
 
         if result.get("success"):
@@ -129,24 +260,19 @@ def verify_maxcut_claim(api_url: str, claim: dict) -> dict:
     """Verify Max-Cut performance claim via API."""
     n = claim["parameters"]["num_nodes"]
 
-    print(f"  Generating random graph: n={n}")
+    log_progress(claim, f"Generating random graph: n={n}")
 
     if not HAS_NUMPY:
         return {"claim_id": claim["id"], "verified": None, "error": "numpy required"}
+    if not HAS_GENERATORS:
+        return {"claim_id": claim["id"], "verified": None,
+                "error": "generate_problems.py not importable (add scripts/ to sys.path)"}
 
-    np.random.seed(42)
-    adj = np.zeros((n, n))
-    num_edges = n * 5
-    for _ in range(num_edges):
-        i, j = np.random.randint(0, n, 2)
-        if i != j:
-            adj[i, j] = 1
-            adj[j, i] = 1
-
-    payload = {"adjacency": adj.tolist()}
+    payload = maxcut_payload(n)
 
     try:
-        resp = requests.post(f"{api_url}/solve/maxcut", json=payload, timeout=300)
+        resp = get_session().post(f"{api_url}/solve/maxcut", data=payload,
+                                  headers=JSON_HEADERS, timeout=300)
         result = resp.json()
 
         if result.get("success"):
@@ -165,24 +291,45 @@ def verify_maxcut_claim(api_url: str, claim: dict) -> dict:
         return {"claim_id": claim["id"], "verified": None, "error": str(e)}
 
 
-def verify_claim(api_url: str, claim: dict) -> dict:
-    """Route to appropriate verifier based on problem type."""
-    problem_type = claim["problem_type"].lower()
+def verify_million_scale_claim(api_url: str, claim: dict) -> dict:
+    """Million-scale claims are verified via the live demo, not the API."""
+    return {
+        "claim_id": claim["id"],
+        "verified": None,
+        "note": "Million-scale claims verified via live demo at https://1millionspins.originneural.ai/"
+    }
+
+
+VERIFIERS = {
+    "sat": verify_sat_claim,
+    "ising": verify_ising_claim,
+    "maxcut": verify_maxcut_claim,
+    "million-scale": verify_million_scale_claim,
+}
+
+
+def claim_kind(problem_type: str):
+    """Map a claim's free-form problem_type to a VERIFIERS key (or None)."""
+    problem_type = problem_type.lower()
 
     if "sat" in problem_type:
-        return verify_sat_claim(api_url, claim)
-    elif "ising" in problem_type and "million" not in problem_type.lower():
-        return verify_ising_claim(api_url, claim)
+        return "sat"
+    elif "ising" in problem_type and "million" not in problem_type:
+        return "ising"
     elif "max-cut" in problem_type or "maxcut" in problem_type:
-        return verify_maxcut_claim(api_url, claim)
-    elif "million" in problem_type.lower():
-        return {
-            "claim_id": claim["id"],
-            "verified": None,
-            "note": "Million-scale claims verified via live demo at https://1millionspins.originneural.ai/"
-        }
-    else:
-        return {"claim_id": claim["id"], "verified": None, "error": f"No verifier for {problem_type}"}
+        return "maxcut"
+    elif "million" in problem_type:
+        return "million-scale"
+    return None
+
+
+def verify_claim(api_url: str, claim: dict) -> dict:
+    """Route to appropriate verifier based on problem type."""
+    verifier = VERIFIERS.get(claim_kind(claim["problem_type"]))
+    if verifier is None:
+        return {"claim_id": claim["id"], "verified": None,
+                "error": f"No verifier for {claim['problem_type'].lower()}"}
+    return verifier(api_url, claim)
 
 
 def main():
@@ -192,6 +339,8 @@ def main():
     parser.add_argument("--claim", help="Verify specific claim by ID (e.g., SAT-001)")
     parser.add_argument("--all", action="store_true", help="Verify all claims")
     parser.add_argument("--list", action="store_true", help="List available claims")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Claims verified concurrently (default: 4)")
 
     args = parser.parse_args()
 
@@ -215,8 +364,6 @@ def main():
     print(f"API: {args.api_url}")
     print()
 
-    results = []
-
     if args.claim:
         matching = [c for c in claims_data["claims"] if c["id"] == args.claim]
         if not matching:
@@ -229,11 +376,15 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    for claim in claims_to_verify:
-        print(f"Verifying {claim['id']}: {claim['description']}")
-        result = verify_claim(args.api_url, claim)
-        results.append(result)
+    # Verifiers are network-bound, so run them concurrently; progress lines
+    # are tagged with the claim id and results are reported in claim order
+    print(f"Verifying {len(claims_to_verify)} claim(s)...")
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        results = list(executor.map(lambda c: verify_claim(args.api_url, c), claims_to_verify))
+    print()
 
+    for claim, result in zip(claims_to_verify, results):
+        print(f"{claim['id']}: {claim['description']}")
         status = "VERIFIED" if result.get("verified") else \
                  "FAILED" if result.get("verified") is False else "SKIPPED"
         print(f"  Result: {status}")